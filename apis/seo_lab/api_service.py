@@ -1,20 +1,29 @@
 #!/usr/bin/env python3
 """
-FastAPI service for CrewAI SEO Lab integration
-Deploy this to Render.com or similar platform
+FastAPI router for CrewAI SEO Lab integration
+Included by main.py - deploy the main app to Render.com or similar platform
 """
 
+import hashlib
+import hmac
 import os
+import queue
+import re
 import time
 import tempfile
 import shutil
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
-from fastapi import FastAPI, Header, HTTPException, BackgroundTasks
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+import msgspec
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from dotenv import load_dotenv
 
 # Import your existing CrewAI setup - Fixed import paths
@@ -24,24 +33,11 @@ from .context_chunking import ContextChunker, get_task_stage
 # Load environment variables
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="CrewAI SEO Lab API",
-    description="API for generating SEO blog content using CrewAI",
-    version="1.0.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# SEO Lab routes - included by the main app under /api/seo
+router = APIRouter(tags=["seo"])
 
-# Request/Response models
-class GeneratePayload(BaseModel):
+# Request/Response models - msgspec structs decode without Pydantic validation overhead
+class GeneratePayload(msgspec.Struct):
     brand: str
     topic: str
     keywords: Optional[list[str]] = None
@@ -51,85 +47,116 @@ class GeneratePayload(BaseModel):
     language: Optional[str] = "pt-BR"
     additionalContext: Optional[str] = None
 
-class GenerateResponse(BaseModel):
+class GenerateResponse(msgspec.Struct):
     html: str
     meta: Optional[Dict[str, Any]] = None
     stats: Optional[Dict[str, Any]] = None
     traceId: Optional[str] = None
 
+# FastAPI can't introspect msgspec structs, so publish their schemas for the docs
+_, _SCHEMAS = msgspec.json.schema_components([GeneratePayload, GenerateResponse])
+
 # Configuration
 API_KEY = os.getenv("EDGE_API_KEY", "your-secret-key-here")
 BASE_DIR = Path(__file__).resolve().parent
+INVALID_FILENAME_RE = re.compile(r'[<>:"|?*\\\/]')
+METAFIELDS_RE = re.compile(r'^(title|description|keywords):[ \t]*(.*)$', re.MULTILINE)
+
+async def require_api_key(x_api_key: str = Header(alias="x-api-key")):
+    """Reject requests without a valid API key before the body is decoded."""
+    if not hmac.compare_digest(x_api_key.encode(), API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+@lru_cache(maxsize=1)
+def _get_crew():
+    """
+    Build the SEOLab_CPG crew once per process and reuse it across requests.
+    The cached crew is never kicked off directly - callers run a copy.
+    """
+    return SEOLab_CPG().crew()
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename by removing invalid characters."""
-    import re
-    invalid_chars = r'[<>:"|?*\\\/]'
-    sanitized = re.sub(invalid_chars, '', filename)
-    sanitized = sanitized.strip(' .')
-    if not sanitized:
-        sanitized = 'untitled'
-    if len(sanitized) > 200:
-        sanitized = sanitized[:200]
-    return sanitized
+    return (INVALID_FILENAME_RE.sub('', filename).strip(' .') or 'untitled')[:200]
 
-def create_mock_inputs(payload: GeneratePayload) -> Dict[str, Any]:
-    """Create mock inputs for the CrewAI system based on the payload."""
-    
-    # Create a temporary brand folder structure
-    temp_dir = tempfile.mkdtemp()
-    brand_folder = Path(temp_dir) / "temp_brand"
-    posts_folder = brand_folder / "posts"
-    posts_folder.mkdir(parents=True, exist_ok=True)
-    
-    # Create basic brand context files
-    editorials_file = brand_folder / "editorials.md"
-    editorials_file.write_text(f"""
-# Editorial Guidelines for {payload.brand}
+# Brand context files written into every scratch brand folder. Only the
+# brand/topic specific fields are filled in per request via format_map.
+# Structured data (brief, keywords, products) travels in the inputs dict.
+BRAND_FILE_TEMPLATES = {
+    "editorials.md": """
+# Editorial Guidelines for {brand}
 
 ## Voice and Tone
 - Professional yet approachable
-- Focus on {payload.topic}
-- Language: {payload.language}
+- Focus on {topic}
+- Language: {language}
 
 ## Content Structure
 - Clear headings and subheadings
 - SEO-optimized content
 - Engaging narrative flow
-""", encoding='utf-8')
-    
-    # Create brief summary
-    brief_summary_file = posts_folder / "brief_summary.py"
-    brief_summary_content = f"""
-brief_summary = {{
-    "{payload.topic}": "Comprehensive guide about {payload.topic} for {payload.brand} audience. Focus on practical insights and actionable advice."
-}}
-"""
-    brief_summary_file.write_text(brief_summary_content, encoding='utf-8')
+""",
+}
+
+# Bounded LIFO pool of scratch directories, recycled instead of mkdtemp/rmtree per request
+SCRATCH_POOL_SIZE = 16
+_DIR_POOL: queue.LifoQueue = queue.LifoQueue(maxsize=SCRATCH_POOL_SIZE)
+
+def prefill_dir_pool() -> None:
+    """Pre-create scratch directories so requests don't pay for mkdtemp."""
+    while not _DIR_POOL.full():
+        try:
+            _DIR_POOL.put_nowait(Path(tempfile.mkdtemp()))
+        except queue.Full:
+            break
+
+def _acquire_scratch_dir() -> Path:
+    """Take a clean scratch directory from the pool, creating one if it is empty."""
+    try:
+        return _DIR_POOL.get_nowait()
+    except queue.Empty:
+        return Path(tempfile.mkdtemp())
+
+def release_scratch_dir(scratch_dir: Path) -> None:
+    """Clear a scratch directory and return it to the pool, or delete it if the pool is full."""
+    try:
+        for entry in scratch_dir.iterdir():
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink(missing_ok=True)
+        # Only an empty directory may be reused - stale output must never be served
+        if next(scratch_dir.iterdir(), None) is None:
+            _DIR_POOL.put_nowait(scratch_dir)
+            return
+    except (OSError, queue.Full):
+        pass
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def drain_dir_pool() -> None:
+    """Delete every pooled scratch directory (called at shutdown)."""
+    while True:
+        try:
+            scratch_dir = _DIR_POOL.get_nowait()
+        except queue.Empty:
+            break
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def create_mock_inputs(payload: GeneratePayload) -> Dict[str, Any]:
+    """Create mock inputs for the CrewAI system based on the payload."""
     
-    # Create keywords file
-    keywords_file = posts_folder / "keywords.py"
-    keywords_content = f"""
-keywords = {{
-    "{payload.topic}": {{
-        "primary_keywords": {payload.keywords or []},
-        "long_tail_keywords": [],
-        "related_searches": [],
-        "search_volume": {{}},
-        "competition_level": "medium"
-    }}
-}}
-"""
-    keywords_file.write_text(keywords_content, encoding='utf-8')
+    # Create the brand folder skeleton inside a pooled scratch dir
+    brand_folder = _acquire_scratch_dir() / "temp_brand"
+    (brand_folder / "posts").mkdir(parents=True, exist_ok=True)
     
-    # Create products file
-    products_file = posts_folder / "products.py"
-    products_content = f"""
-products = {{
-    "{payload.topic}": []
-}}
-"""
-    products_file.write_text(products_content, encoding='utf-8')
+    # Fill in the brand/topic specific fields
+    fields = {
+        'brand': payload.brand,
+        'topic': payload.topic,
+        'language': payload.language
+    }
+    for relative_path, template in BRAND_FILE_TEMPLATES.items():
+        (brand_folder / relative_path).write_text(template.format_map(fields), encoding='utf-8')
     
     # Build the inputs dictionary that matches your existing system
     inputs = {
@@ -141,6 +168,21 @@ products = {{
         'benchmarks': f"Industry benchmarks for {payload.topic}",
         'format_recommendations': "HTML format with proper SEO structure",
         'semantic_fields': [payload.topic] + (payload.keywords or []),
+        'brief_summary': {
+            payload.topic: f"Comprehensive guide about {payload.topic} for {payload.brand} audience. Focus on practical insights and actionable advice."
+        },
+        'keywords_data': {
+            payload.topic: {
+                'primary_keywords': payload.keywords or [],
+                'long_tail_keywords': [],
+                'related_searches': [],
+                'search_volume': {},
+                'competition_level': 'medium'
+            }
+        },
+        'products_data': {
+            payload.topic: []
+        },
         'brand_folder': str(brand_folder),
         'macro_name': datetime.now().strftime("%H_%M"),
         'preferred_language': payload.language or 'pt_BR',
@@ -154,12 +196,135 @@ products = {{
     
     return inputs, brand_folder
 
-@app.get("/")
+def warm_up() -> None:
+    """
+    Prewarm per-process state at startup so the first request doesn't pay for it:
+    the cached crew (YAML, agents, tasks, LLM clients) and the scratch directory pool.
+    """
+    prefill_dir_pool()
+    try:
+        _get_crew()
+    except Exception as e:
+        # Not fatal - the first request will build the crew instead
+        print(f"⚠️  SEO Lab crew prewarm failed: {e}")
+
+# Exact-match cache of generated results, keyed by the payload fields that feed the crew.
+# In-process and bounded; RESULT_CACHE_TTL=0 disables it.
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_SIZE = 128
+_RESULT_CACHE: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+
+def result_cache_key(payload: GeneratePayload) -> str:
+    """Hash the generation inputs. Keyword order matters - the prompts take the first ones first."""
+    key_fields = {
+        'brand': payload.brand,
+        'topic': payload.topic,
+        'keywords': payload.keywords or [],
+        'language': payload.language,
+        'additionalContext': payload.additionalContext
+    }
+    return hashlib.blake2b(orjson.dumps(key_fields, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+def get_cached_result(key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return (html, meta) for a fresh cache entry, evicting it if expired."""
+    entry = _RESULT_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, html_content, meta_data = entry
+    if expires_at < time.time():
+        del _RESULT_CACHE[key]
+        return None
+    _RESULT_CACHE.move_to_end(key)
+    return html_content, meta_data
+
+def store_cached_result(key: str, html_content: str, meta_data: Dict[str, Any]) -> None:
+    """Cache a generated result, dropping the least recently used entry when full."""
+    if RESULT_CACHE_TTL <= 0:
+        return
+    _RESULT_CACHE[key] = (time.time() + RESULT_CACHE_TTL, html_content, meta_data)
+    _RESULT_CACHE.move_to_end(key)
+    while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
+
+def _wants_html(accept: str) -> bool:
+    """True if the Accept header explicitly lists text/html (q > 0) at least as high as JSON."""
+    qualities = {}
+    for media_range in accept.split(','):
+        media_type, *params = media_range.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.strip().lower()] = quality
+    html_q = qualities.get('text/html', 0.0)
+    json_q = qualities.get('application/json', qualities.get('application/*', qualities.get('*/*', 0.0)))
+    return html_q > 0 and html_q >= json_q
+
+def _result_response(html_content: str, meta_data: Dict[str, Any], duration_ms: int,
+                     trace_id: str, cached: bool = False) -> ORJSONResponse:
+    """Build the /generate JSON envelope (shape documented by GenerateResponse)."""
+    # Trusted data we just built - serialize the dict directly
+    return ORJSONResponse({
+        'html': html_content,
+        'meta': meta_data,
+        'stats': {
+            'durationMs': duration_ms,
+            'tokens': 0,  # Add actual token count if available
+            'cached': cached
+        },
+        'traceId': trace_id
+    })
+
+def _run_crew_sync(payload: GeneratePayload, inputs: Dict[str, Any], brand_folder: Path):
+    """
+    Run the blocking CrewAI pipeline for a single request.
+    Called from a worker thread so the event loop stays free.
+    """
+    # Get the first (and only) theme
+    theme_name = list(inputs['themes'].keys())[0]
+    theme = inputs['themes'][theme_name]
+    keywords_data = inputs['keywords_data'][theme_name]
+
+    # Build theme inputs
+    theme_inputs = {
+        'voice': inputs['voice'],
+        'brand': inputs['brand'],
+        'name': theme_name,
+        'theme': theme,
+        'products': inputs['products'],
+        'blog': inputs['blog'],
+        'benchmarks': inputs['benchmarks'],
+        'format_recommendations': inputs['format_recommendations'],
+        'semantic_fields': inputs['semantic_fields'],
+        'theme_keywords': payload.keywords or [],
+        'keyword_opportunities': (payload.keywords or [])[:5],
+        'preferred_language': inputs['preferred_language'],
+        'brief_summary': f"Comprehensive guide about {theme} for {inputs['brand']} audience",
+        'theme_products': inputs['products_data'][theme_name],
+        'theme_keywords_data': keywords_data,
+        'primary_keywords': keywords_data['primary_keywords'],
+        'long_tail_keywords': keywords_data['long_tail_keywords'],
+        'related_searches': keywords_data['related_searches'],
+        'search_volume': keywords_data['search_volume'],
+        'competition_level': keywords_data['competition_level'],
+        'editorial_guidelines': f"Professional content for {inputs['brand']} focusing on {theme}",
+        'brand_folder': str(brand_folder)
+    }
+
+    # Run a per-request copy of the cached crew
+    crew_instance = _get_crew().copy()
+    return crew_instance.kickoff(inputs=theme_inputs)
+
+@router.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "CrewAI SEO Lab API is running", "status": "healthy"}
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Detailed health check"""
     return {
@@ -168,67 +333,58 @@ async def health_check():
         "version": "1.0.0"
     }
 
-@app.post("/generate", response_model=GenerateResponse)
+@router.post(
+    "/generate",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _SCHEMAS["GeneratePayload"]}}
+        }
+    },
+    responses={200: {"content": {
+        "application/json": {"schema": _SCHEMAS["GenerateResponse"]},
+        "text/html": {"schema": {"type": "string"}}
+    }}},
+    dependencies=[Depends(require_api_key)]
+)
 async def generate_blog(
-    payload: GeneratePayload,
-    x_api_key: str = Header(alias="x-api-key")
+    request: Request,
+    background_tasks: BackgroundTasks
 ):
     """
-    Generate SEO blog content using CrewAI
+    Generate SEO blog content using CrewAI.
+    Send `Accept: text/html` to receive the generated HTML file streamed directly.
     """
-    # Validate API key
-    if x_api_key != API_KEY:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    # Decode and validate the request body
+    try:
+        payload = msgspec.json.decode(await request.body(), type=GeneratePayload)
+    except msgspec.DecodeError as e:
+        # Same 422 body shape FastAPI uses for its own validation errors
+        raise RequestValidationError([{'loc': ('body',), 'msg': str(e), 'type': 'value_error'}])
     
     start_time = time.time()
     trace_id = f"trace_{int(time.time())}"
+    wants_html = _wants_html(request.headers.get('accept', ''))
+    
+    # Serve identical requests from the result cache
+    cache_key = result_cache_key(payload)
+    cached = get_cached_result(cache_key)
+    if cached is not None:
+        html_content, meta_data = cached
+        duration_ms = int((time.time() - start_time) * 1000)
+        if wants_html:
+            return HTMLResponse(
+                html_content,
+                headers={'X-Trace-Id': trace_id, 'X-Duration-Ms': str(duration_ms), 'X-Cache': 'hit'}
+            )
+        return _result_response(html_content, meta_data, duration_ms, trace_id, cached=True)
     
     try:
         # Create mock inputs for the CrewAI system
-        inputs, brand_folder = create_mock_inputs(payload)
+        inputs, brand_folder = await run_in_threadpool(create_mock_inputs, payload)
         
-        # Initialize the CrewAI system
-        seo_lab_cpg = SEOLab_CPG(brand_folder)
-        seo_lab_cpg.initialize_context_chunker(inputs)
-        
-        # Get the first (and only) theme
-        theme_name = list(inputs['themes'].keys())[0]
-        theme = inputs['themes'][theme_name]
-        
-        # Build theme inputs
-        theme_inputs = {
-            'voice': inputs['voice'],
-            'brand': inputs['brand'],
-            'name': theme_name,
-            'theme': theme,
-            'products': inputs['products'],
-            'blog': inputs['blog'],
-            'benchmarks': inputs['benchmarks'],
-            'format_recommendations': inputs['format_recommendations'],
-            'semantic_fields': inputs['semantic_fields'],
-            'theme_keywords': payload.keywords or [],
-            'keyword_opportunities': (payload.keywords or [])[:5],
-            'preferred_language': inputs['preferred_language'],
-            'brief_summary': f"Comprehensive guide about {theme} for {inputs['brand']} audience",
-            'theme_products': [],
-            'theme_keywords_data': {
-                'primary_keywords': payload.keywords or [],
-                'long_tail_keywords': [],
-                'related_searches': [],
-                'search_volume': {},
-                'competition_level': 'medium'
-            },
-            'primary_keywords': payload.keywords or [],
-            'long_tail_keywords': [],
-            'related_searches': [],
-            'search_volume': {},
-            'competition_level': 'medium',
-            'editorial_guidelines': f"Professional content for {inputs['brand']} focusing on {theme}"
-        }
-        
-        # Run the CrewAI system
-        crew_instance = seo_lab_cpg.crew()
-        result = crew_instance.kickoff(inputs=theme_inputs)
+        # Run the CrewAI system off the event loop
+        await run_in_threadpool(_run_crew_sync, payload, inputs, brand_folder)
         
         # Read the generated content
         content_file = brand_folder / 'posts' / 'content.html'
@@ -237,23 +393,29 @@ async def generate_blog(
         if not content_file.exists():
             raise FileNotFoundError("Content file not generated")
         
+        # Stream the HTML file as-is when the client asks for it - no JSON envelope
+        # (streamed results are not cached - the HTML is never loaded into memory)
+        if wants_html:
+            duration_ms = int((time.time() - start_time) * 1000)
+            # The scratch directory is recycled only after the file has been streamed
+            background_tasks.add_task(release_scratch_dir, brand_folder.parent)
+            return FileResponse(
+                content_file,
+                media_type='text/html',
+                headers={'X-Trace-Id': trace_id, 'X-Duration-Ms': str(duration_ms)}
+            )
+        
         # Read the HTML content
-        html_content = content_file.read_text(encoding='utf-8')
+        html_content = await run_in_threadpool(content_file.read_text, encoding='utf-8')
         
         # Read metadata if available
         meta_data = {}
         if metafields_file.exists():
-            metafields_content = metafields_file.read_text(encoding='utf-8')
-            # Parse basic metadata from the markdown file
-            lines = metafields_content.split('\n')
-            for line in lines:
-                if line.startswith('title:'):
-                    meta_data['title'] = line.replace('title:', '').strip()
-                elif line.startswith('description:'):
-                    meta_data['description'] = line.replace('description:', '').strip()
-                elif line.startswith('keywords:'):
-                    keywords_str = line.replace('keywords:', '').strip()
-                    meta_data['keywords'] = [k.strip() for k in keywords_str.split(',') if k.strip()]
+            metafields_content = await run_in_threadpool(metafields_file.read_text, encoding='utf-8')
+            # Parse basic metadata from the markdown file in a single pass
+            meta_data = {m.group(1): m.group(2).strip() for m in METAFIELDS_RE.finditer(metafields_content)}
+            if 'keywords' in meta_data:
+                meta_data['keywords'] = [k.strip() for k in meta_data['keywords'].split(',') if k.strip()]
         
         # If no metadata was found, create basic ones
         if not meta_data:
@@ -265,35 +427,18 @@ async def generate_blog(
         
         duration_ms = int((time.time() - start_time) * 1000)
         
-        # Cleanup temporary files
-        try:
-            shutil.rmtree(brand_folder.parent)
-        except:
-            pass  # Ignore cleanup errors
+        # Recycle the scratch directory once the response has been sent
+        background_tasks.add_task(release_scratch_dir, brand_folder.parent)
         
-        return GenerateResponse(
-            html=html_content,
-            meta=meta_data,
-            stats={
-                'durationMs': duration_ms,
-                'tokens': 0  # Add actual token count if available
-            },
-            traceId=trace_id
-        )
+        store_cached_result(cache_key, html_content, meta_data)
+        return _result_response(html_content, meta_data, duration_ms, trace_id)
         
     except Exception as e:
-        # Cleanup on error
-        try:
-            if 'brand_folder' in locals():
-                shutil.rmtree(brand_folder.parent)
-        except:
-            pass
+        # Cleanup on error - error responses don't run background tasks
+        if 'brand_folder' in locals():
+            await run_in_threadpool(release_scratch_dir, brand_folder.parent)
         
         raise HTTPException(
             status_code=500, 
             detail=f"Content generation failed: {str(e)}"
         )
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -8,9 +8,86 @@ by providing only the necessary context for each task stage.
 
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from types import SimpleNamespace
+from functools import lru_cache
+import heapq
 import json
 
 
+def limit_products(products: str, max_products: int = 3) -> str:
+    """Limit product information to reduce token usage"""
+    if not products:
+        return products
+    
+    # If products is a string, try to extract key information
+    if isinstance(products, str):
+        return _limit_products_cached(products, max_products)
+    
+    return products
+
+
+@lru_cache(maxsize=256)
+def _limit_products_cached(products: str, max_products: int) -> str:
+    # Simple heuristic: take first few sentences or limit length
+    sentences = products.split('.')
+    limited_sentences = sentences[:max_products]
+    return '. '.join(limited_sentences) + '.'
+
+
+def limit_keywords(keywords: List[Dict], max_keywords: int = 5) -> List[Dict]:
+    """Limit keyword data to reduce token usage"""
+    if not keywords:
+        return keywords
+    # Partial selection - O(N log K) instead of sorting the whole list
+    return heapq.nlargest(max_keywords, keywords, key=_keyword_volume)
+
+
+def _keyword_volume(keyword: Any) -> int:
+    return keyword.get('Volume', 0) if isinstance(keyword, dict) else 0
+
+
+@lru_cache(maxsize=256)
+def summarize_strategy(strategy_output: str) -> str:
+    """Summarize strategy output to reduce token usage"""
+    if not strategy_output:
+        return ""
+    
+    # Take first 200 characters as summary
+    summary = strategy_output[:200]
+    if len(strategy_output) > 200:
+        summary += "..."
+    
+    return summary
+
+
+def summarize_semantic_fields(semantic_fields: Dict) -> Dict:
+    """Summarize semantic fields to reduce token usage"""
+    if not semantic_fields or not isinstance(semantic_fields, dict):
+        return {}
+    
+    # For each theme, take only the most important semantic data
+    summarized = {}
+    for theme, data in semantic_fields.items():
+        if isinstance(data, dict):
+            # Take only key semantic information
+            summarized[theme] = {
+                'related_google': data.get('related_google', [])[:5],  # Top 5 related keywords
+                'search_intent': data.get('search_intent', ''),
+                'suggested_titles': data.get('suggested_titles', [])[:3]  # Top 3 titles
+            }
+    
+    return summarized
+
+
+def _copy_containers(value: Any) -> Any:
+    """Copy the lists/dicts of a reduced value so each stage context owns its containers"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    return value
+
+
 class ContextChunker:
     """
     Manages progressive context loading for different task stages.
@@ -27,6 +104,31 @@ class ContextChunker:
         self.full_context = full_context
         self.context_cache = {}
         
+        # Base context that all agents need - identical for every call
+        self.base_context = {
+            'brand': full_context.get('brand', ''),
+            'voice': full_context.get('voice', ''),
+            'theme': full_context.get('theme', ''),
+            'name': full_context.get('name', ''),
+            'preferred_language': full_context.get('preferred_language', 'pt_BR')
+        }
+        
+        # Trimmed view of the full context - every lookup and reducer runs once.
+        # Stage builders copy its list/dict values, so contexts never share containers.
+        self._view = SimpleNamespace(
+            brand=full_context.get('brand', ''),
+            voice=full_context.get('voice', ''),
+            benchmarks=full_context.get('benchmarks', ''),
+            blog=full_context.get('blog', ''),
+            format_recommendations=full_context.get('format_recommendations', ''),
+            brief_summary=full_context.get('brief_summary', ''),
+            products=limit_products(full_context.get('products', '')),
+            strategy_summary=summarize_strategy(full_context.get('strategy_output', '')),
+            theme_keywords=limit_keywords(full_context.get('theme_keywords', [])),
+            keyword_opportunities=limit_keywords(full_context.get('keyword_opportunities', [])),
+            semantic_fields=summarize_semantic_fields(full_context.get('semantic_fields', {}))
+        )
+        
     def get_minimal_context(self, agent_role: str, task_stage: str) -> Dict[str, Any]:
         """
         Get minimal context for specific agent and task stage.
@@ -38,38 +140,21 @@ class ContextChunker:
         Returns:
             Dict containing only the necessary context for this agent/task
         """
-        cache_key = f"{agent_role}_{task_stage}"
+        cache_key = (agent_role, task_stage)
         
-        if cache_key in self.context_cache:
-            return self.context_cache[cache_key]
+        context = self.context_cache.get(cache_key)
+        if context is not None:
+            return context
         
-        # Base context that all agents need
-        base_context = {
-            'brand': self.full_context.get('brand', ''),
-            'voice': self.full_context.get('voice', ''),
-            'theme': self.full_context.get('theme', ''),
-            'name': self.full_context.get('name', ''),
-            'preferred_language': self.full_context.get('preferred_language', 'pt_BR')
-        }
+        base_context = self.base_context
         
         # Progressive context building based on task stage
-        if task_stage == 'strategy':
-            context = self._get_strategy_context(base_context)
-        elif task_stage == 'products':
-            context = self._get_products_context(base_context)
-        elif task_stage == 'seo':
-            context = self._get_seo_context(base_context)
-        elif task_stage == 'content':
-            context = self._get_content_context(base_context)
-        elif task_stage == 'refinement':
-            context = self._get_refinement_context(base_context)
-        elif task_stage == 'review':
-            context = self._get_review_context(base_context)
-        elif task_stage == 'visual':
-            context = self._get_visual_context(base_context)
+        handler = self._STAGE_DISPATCH.get(task_stage)
+        if handler:
+            context = handler(self, base_context)
         else:
-            # Fallback to base context
-            context = base_context
+            # Fallback to base context (copied, agent adjustments mutate it)
+            context = dict(base_context)
         
         # Agent-specific context adjustments
         context = self._adjust_for_agent(agent_role, context)
@@ -81,154 +166,114 @@ class ContextChunker:
     
     def _get_strategy_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for strategy tasks (brand_strategist)"""
-        return {
-            **base_context,
-            'benchmarks': self.full_context.get('benchmarks', ''),
-            'blog': self.full_context.get('blog', ''),
-            'format_recommendations': self.full_context.get('format_recommendations', '')
-        }
+        view = self._view
+        return dict(
+            base_context,
+            benchmarks=view.benchmarks,
+            blog=view.blog,
+            format_recommendations=view.format_recommendations
+        )
     
     def _get_products_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for product identification tasks"""
-        # Get strategy output if available
-        strategy_output = self.full_context.get('strategy_output', '')
-        
-        return {
-            **base_context,
-            'products': self._limit_products(self.full_context.get('products', '')),
-            'strategy_summary': self._summarize_strategy(strategy_output)
-        }
+        view = self._view
+        return dict(
+            base_context,
+            products=view.products,
+            strategy_summary=view.strategy_summary
+        )
     
     def _get_seo_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for SEO tasks (seo_specialist)"""
-        return {
-            **base_context,
-            'products': self._limit_products(self.full_context.get('products', '')),
-            'theme_keywords': self._limit_keywords(self.full_context.get('theme_keywords', [])),
-            'keyword_opportunities': self._limit_keywords(self.full_context.get('keyword_opportunities', [])),
-            'semantic_fields': self._summarize_semantic_fields(self.full_context.get('semantic_fields', {}))
-        }
+        view = self._view
+        return dict(
+            base_context,
+            products=view.products,
+            theme_keywords=_copy_containers(view.theme_keywords),
+            keyword_opportunities=_copy_containers(view.keyword_opportunities),
+            semantic_fields=_copy_containers(view.semantic_fields)
+        )
     
     def _get_content_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for content writing tasks (seo_blog_writer)"""
-        return {
-            **base_context,
-            'products': self._limit_products(self.full_context.get('products', '')),
-            'theme_keywords': self._limit_keywords(self.full_context.get('theme_keywords', [])),
-            'keyword_opportunities': self._limit_keywords(self.full_context.get('keyword_opportunities', [])),
-            'semantic_fields': self._summarize_semantic_fields(self.full_context.get('semantic_fields', {})),
-            'format_recommendations': self.full_context.get('format_recommendations', ''),
-            'blog': self.full_context.get('blog', ''),
-            'brief_summary': self.full_context.get('brief_summary', '')
-        }
+        view = self._view
+        return dict(
+            base_context,
+            products=view.products,
+            theme_keywords=_copy_containers(view.theme_keywords),
+            keyword_opportunities=_copy_containers(view.keyword_opportunities),
+            semantic_fields=_copy_containers(view.semantic_fields),
+            format_recommendations=view.format_recommendations,
+            blog=view.blog,
+            brief_summary=view.brief_summary
+        )
     
     def _get_refinement_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for narrative refinement tasks (narrative_editor)"""
-        return {
-            **base_context,
-            'voice': self.full_context.get('voice', ''),
-            'benchmarks': self.full_context.get('benchmarks', ''),
-            'format_recommendations': self.full_context.get('format_recommendations', '')
-        }
+        view = self._view
+        return dict(
+            base_context,
+            voice=view.voice,
+            benchmarks=view.benchmarks,
+            format_recommendations=view.format_recommendations
+        )
     
     def _get_review_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for content review tasks (content_reviewer)"""
-        return {
-            **base_context,
-            'products': self._limit_products(self.full_context.get('products', '')),
-            'voice': self.full_context.get('voice', '')
-        }
+        view = self._view
+        return dict(
+            base_context,
+            products=view.products,
+            voice=view.voice
+        )
     
     def _get_visual_context(self, base_context: Dict[str, Any]) -> Dict[str, Any]:
         """Context for visual consultant tasks (visual_consultant)"""
-        return {
-            **base_context,
-            'brand': self.full_context.get('brand', ''),
-            'voice': self.full_context.get('voice', '')
-        }
+        view = self._view
+        return dict(
+            base_context,
+            brand=view.brand,
+            voice=view.voice
+        )
+    
+    # Agent-specific focus blocks: role -> (context key, ((field, default factory), ...))
+    _AGENT_FOCUS = {
+        # Brand strategist needs more brand context
+        'brand_strategist': ('brand_context', (('brand', str), ('voice', str), ('benchmarks', str))),
+        # SEO specialist needs keyword focus
+        'seo_specialist': ('seo_focus', (('theme_keywords', list), ('keyword_opportunities', list))),
+        # Blog writer needs content focus
+        'seo_copywriter': ('content_focus', (('format_recommendations', str), ('semantic_fields', dict)))
+    }
     
     def _adjust_for_agent(self, agent_role: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Make agent-specific adjustments to context"""
-        if agent_role == 'brand_strategist':
-            # Brand strategist needs more brand context
-            context['brand_context'] = {
-                'brand': context.get('brand', ''),
-                'voice': context.get('voice', ''),
-                'benchmarks': context.get('benchmarks', '')
-            }
-        elif agent_role == 'seo_specialist':
-            # SEO specialist needs keyword focus
-            context['seo_focus'] = {
-                'theme_keywords': context.get('theme_keywords', []),
-                'keyword_opportunities': context.get('keyword_opportunities', [])
-            }
-        elif agent_role == 'seo_copywriter':
-            # Blog writer needs content focus
-            context['content_focus'] = {
-                'format_recommendations': context.get('format_recommendations', ''),
-                'semantic_fields': context.get('semantic_fields', {})
+        focus = self._AGENT_FOCUS.get(agent_role)
+        if focus:
+            focus_key, fields = focus
+            context[focus_key] = {
+                field: context[field] if field in context else default()
+                for field, default in fields
             }
         
         return context
     
-    def _limit_products(self, products: str, max_products: int = 3) -> str:
-        """Limit product information to reduce token usage"""
-        if not products:
-            return products
-        
-        # If products is a string, try to extract key information
-        if isinstance(products, str):
-            # Simple heuristic: take first few sentences or limit length
-            sentences = products.split('.')
-            limited_sentences = sentences[:max_products]
-            return '. '.join(limited_sentences) + '.'
-        
-        return products
-    
-    def _limit_keywords(self, keywords: List[Dict], max_keywords: int = 5) -> List[Dict]:
-        """Limit keyword data to reduce token usage"""
-        if not keywords:
-            return keywords
-        
-        # Sort by volume and take top keywords
-        sorted_keywords = sorted(keywords, key=lambda x: x.get('Volume', 0), reverse=True)
-        return sorted_keywords[:max_keywords]
-    
-    def _summarize_strategy(self, strategy_output: str) -> str:
-        """Summarize strategy output to reduce token usage"""
-        if not strategy_output:
-            return ""
-        
-        # Take first 200 characters as summary
-        summary = strategy_output[:200]
-        if len(strategy_output) > 200:
-            summary += "..."
-        
-        return summary
-    
-    def _summarize_semantic_fields(self, semantic_fields: Dict) -> Dict:
-        """Summarize semantic fields to reduce token usage"""
-        if not semantic_fields:
-            return {}
-        
-        # For each theme, take only the most important semantic data
-        summarized = {}
-        for theme, data in semantic_fields.items():
-            if isinstance(data, dict):
-                # Take only key semantic information
-                summarized[theme] = {
-                    'related_google': data.get('related_google', [])[:5],  # Top 5 related keywords
-                    'search_intent': data.get('search_intent', ''),
-                    'suggested_titles': data.get('suggested_titles', [])[:3]  # Top 3 titles
-                }
-        
-        return summarized
+    # Task stage -> context builder, looked up once per get_minimal_context miss
+    _STAGE_DISPATCH = {
+        'strategy': _get_strategy_context,
+        'products': _get_products_context,
+        'seo': _get_seo_context,
+        'content': _get_content_context,
+        'refinement': _get_refinement_context,
+        'review': _get_review_context,
+        'visual': _get_visual_context
+    }
     
     def get_context_summary(self) -> Dict[str, Any]:
         """Get a summary of context usage for monitoring"""
         return {
             'total_contexts_generated': len(self.context_cache),
-            'cache_keys': list(self.context_cache.keys()),
+            'cache_keys': [f"{agent_role}_{task_stage}" for agent_role, task_stage in self.context_cache],
             'full_context_keys': list(self.full_context.keys())
         }
 
@@ -1,5 +1,5 @@
 import os
-from crewai import Agent, Crew, Process, Task
+from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from pathlib import Path
 
@@ -8,15 +8,35 @@ from ..context_chunking import ContextChunker, get_task_stage
 
 base_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Output paths are templated and resolved from the kickoff inputs, so one
+# crew definition can be reused across requests with different brand folders
+CONTENT_OUTPUT_FILE = '{brand_folder}/posts/content.html'
+METAFIELDS_OUTPUT_FILE = '{brand_folder}/posts/metafields.md'
+
+
+def build_agent_kwargs() -> dict:
+    """Shared Agent kwargs - opt-in system prompt caching for Anthropic models (see env.example)"""
+    model = os.getenv('MODEL') or os.getenv('OPENAI_MODEL_NAME') or ''
+    prompt_cache = os.getenv('ANTHROPIC_PROMPT_CACHE', '').lower() in ('1', 'true', 'yes')
+    if prompt_cache and model.startswith(('anthropic/', 'claude')):
+        return {
+            'llm': LLM(
+                model=model,
+                cache_control_injection_points=[{'location': 'message', 'role': 'system'}]
+            )
+        }
+    return {}
+
+
 @CrewBase
 class SEOLab_CPG():
     """SEOLab_CPG crew with context chunking for token efficiency"""
-    def __init__(self, brand_folder: Path):
+    def __init__(self):
         self.base_dir = Path(__file__).resolve().parent
-        self.brand_folder = brand_folder
         self.agents_config = 'config/agents.yaml'
         self.tasks_config = 'config/tasks.yaml'
         self.context_chunker = None  # Will be initialized with inputs
+        self.agent_kwargs = build_agent_kwargs()
 
     def initialize_context_chunker(self, inputs: dict):
         """Initialize the context chunker with full inputs"""
@@ -34,14 +54,16 @@ class SEOLab_CPG():
     def brand_strategist(self) -> Agent:
         return Agent(
             config=self.agents_config['brand_strategist'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
     def seo_specialist(self) -> Agent:
         return Agent(
             config=self.agents_config['seo_specialist'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
@@ -49,34 +71,39 @@ class SEOLab_CPG():
         return Agent(
             config=self.agents_config['content_strategist'],
             verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
     def seo_copywriter(self) -> Agent:
         return Agent(
             config=self.agents_config['seo_copywriter'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
     def narrative_editor(self) -> Agent:
         return Agent(
             config=self.agents_config['narrative_editor'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
     def content_reviewer(self) -> Agent:
         return Agent(
             config=self.agents_config['content_reviewer'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @agent
     def visual_consultant(self) -> Agent:
         return Agent(
             config=self.agents_config['visual_consultant'],
-            verbose=True
+            verbose=True,
+            **self.agent_kwargs
         )
 
     @task
@@ -125,21 +152,21 @@ class SEOLab_CPG():
                 self.identify_products(),
                 self.map_opportunities(),
                 self.plan_content()],
-            output_file=str(self.brand_folder / 'posts' / 'content.html')
+            output_file=CONTENT_OUTPUT_FILE
         )
 
     @task
     def refine_narrative(self) -> Task:
         return Task(
             config=self.tasks_config['refine_narrative'],
-            output_file=str(self.brand_folder / 'posts' / 'content.html')
+            output_file=CONTENT_OUTPUT_FILE
         )
 
     @task
     def generate_seo_metafields(self) -> Task:
         return Task(
             config=self.tasks_config['generate_seo_metafields'],
-            output_file=str(self.brand_folder / 'posts' / 'metafields.md')
+            output_file=METAFIELDS_OUTPUT_FILE
         )
 
     @crew
@@ -5,7 +5,9 @@ SEO Lab API for AI-powered content generation
 """
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import uvicorn
 import os
@@ -18,17 +20,20 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 CPG Labs APIs starting up...")
+    await run_in_threadpool(warm_up_seo_lab)
     print("📝 SEO Lab API ready for content generation")
     yield
     # Shutdown
     print("🛑 CPG Labs APIs shutting down...")
+    await run_in_threadpool(drain_seo_lab_pool)
 
 # Create main FastAPI app
 app = FastAPI(
     title="CPG Labs APIs",
     description="AI-powered APIs for content generation using CrewAI",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -41,8 +46,10 @@ app.add_middleware(
 )
 
 # Import and include SEO Lab API
-from apis.seo_lab.api_service import app as seo_app
-app.mount("/api/seo", seo_app)
+from apis.seo_lab.api_service import (
+    router as seo_router, warm_up as warm_up_seo_lab, drain_dir_pool as drain_seo_lab_pool
+)
+app.include_router(seo_router, prefix="/api/seo")
 
 @app.get("/")
 async def root():
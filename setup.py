@@ -3,23 +3,131 @@
 Setup script for CPG Labs APIs
 """
 
-import subprocess
 import sys
+
+# Fail fast on unsupported interpreters before paying for any other imports
+if sys.version_info < (3, 8):
+    sys.stderr.write("Python 3.8+ required\n")
+    sys.exit(1)
+
+import contextlib
+import functools
+import shutil
+import subprocess
 import os
+import re
+import tempfile
 from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+@functools.lru_cache(maxsize=None)
+def _list_dir(directory="."):
+    """Cached directory listing - clear the cache after creating files"""
+    return frozenset(entry.name for entry in os.scandir(directory))
+
+def _exists(path):
+    """Existence check answered from the cached listing of the parent directory"""
+    path = Path(path)
+    return path.name in _list_dir(str(path.parent))
+
+# Environment for every pip run: skip pip's version-check request and .pyc writes
+# for pip's own modules
+PIP_ENV_OVERRIDES = {"PIP_DISABLE_PIP_VERSION_CHECK": "1", "PYTHONDONTWRITEBYTECODE": "1"}
+
+@contextlib.contextmanager
+def pip_environment():
+    """Apply PIP_ENV_OVERRIDES to this process for the duration of an in-process pip run"""
+    saved = {key: os.environ.get(key) for key in PIP_ENV_OVERRIDES}
+    saved_dont_write_bytecode = sys.dont_write_bytecode
+    os.environ.update(PIP_ENV_OVERRIDES)
+    # PYTHONDONTWRITEBYTECODE is only read at interpreter start-up
+    sys.dont_write_bytecode = True
+    try:
+        yield
+    finally:
+        sys.dont_write_bytecode = saved_dont_write_bytecode
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+# Requirements files merged into a single pip install
+REQUIREMENTS_FILES = ("requirements.txt", "apis/seo_lab/requirements.txt")
+# pip comment syntax: '#' at line start or after whitespace (so URL '#egg=' fragments survive)
+REQUIREMENTS_COMMENT_RE = re.compile(r"(^|\s+)#.*$")
+
+# Optional pip cache override - pip's own default cache is already persistent, so only
+# pass --cache-dir when PIP_CACHE_DIR points somewhere else (e.g. a CI cache volume)
+PIP_CACHE_DIR = os.environ.get("PIP_CACHE_DIR")
+
+def run_command(command, description, env=None):
+    """Run a command (argv list, no shell) and handle errors"""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        # Inherit stdout/stderr so pip's progress streams live instead of being buffered
+        subprocess.run(command, check=True, env=env)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ {description} failed: {e}")
-        print(f"Error output: {e.stderr}")
         return False
 
+def pip_install(args, description):
+    """Run pip install in-process, falling back to a pip subprocess"""
+    try:
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        # Older/unusual pip layouts - spawn pip instead
+        return run_command([sys.executable, "-m", "pip", "install", *args], description, env={**os.environ, **PIP_ENV_OVERRIDES})
+    
+    print(f"🔄 {description}...")
+    try:
+        with pip_environment():
+            status = pip_main(["install", *args])
+    except SystemExit as e:
+        status = e.code
+    if status == 0:
+        print(f"✅ {description} completed successfully")
+        return True
+    print(f"❌ {description} failed (pip exit code {status})")
+    return False
+
+def merge_requirements(paths):
+    """
+    Merge requirements files, one entry per project with the combined (stricter) specifier.
+    Raises ValueError for anything that can't be merged safely (pip options, hashes, paths,
+    conflicting markers or URLs) - callers should then install the files as-is.
+    """
+    try:
+        from packaging.requirements import Requirement
+        from packaging.utils import canonicalize_name
+    except ImportError:
+        # packaging isn't installed yet on a fresh machine - pip always vendors it
+        from pip._vendor.packaging.requirements import Requirement
+        from pip._vendor.packaging.utils import canonicalize_name
+    
+    merged = {}
+    for path in paths:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = REQUIREMENTS_COMMENT_RE.sub("", line).strip()
+            if not line:
+                continue
+            if line.startswith("-"):
+                # Options like -r/-c/-e are relative to their own file
+                raise ValueError(f"{path}: can't merge pip option line '{line}'")
+            # InvalidRequirement (a ValueError) for hashes, local paths, continuations...
+            req = Requirement(line)
+            key = canonicalize_name(req.name)
+            previous = merged.get(key)
+            if previous is not None:
+                if str(req.marker) != str(previous.marker) or req.url != previous.url:
+                    raise ValueError(f"{path}: conflicting entries for {req.name}")
+                # Keep both constraints and all requested extras
+                req.specifier &= previous.specifier
+                req.extras |= previous.extras
+            merged[key] = req
+    return [str(req) for req in merged.values()]
+
 def check_python_version():
     """Check if Python version is compatible"""
     print("🔍 Checking Python version...")
@@ -36,15 +144,31 @@ def install_dependencies():
     """Install Python dependencies"""
     print("📦 Installing dependencies...")
     
-    # Install main requirements
-    if not run_command("pip install -r requirements.txt", "Installing main dependencies"):
-        return False
-    
-    # Install SEO Lab requirements
-    if not run_command("pip install -r apis/seo_lab/requirements.txt", "Installing SEO Lab dependencies"):
-        return False
-    
-    return True
+    merged_file = None
+    try:
+        # Merge main and SEO Lab requirements into one deduplicated file so pip resolves
+        # shared packages once
+        try:
+            merged = merge_requirements(REQUIREMENTS_FILES)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not merge requirements files ({e}) - installing them as-is")
+            requirement_args = [arg for path in REQUIREMENTS_FILES for arg in ("-r", path)]
+        else:
+            with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+                merged_file = f.name
+                f.write("\n".join(merged) + "\n")
+            requirement_args = ["-r", merged_file]
+        
+        args = [
+            "--no-input", "--disable-pip-version-check",
+            "--prefer-binary",
+            *(["--cache-dir", PIP_CACHE_DIR] if PIP_CACHE_DIR else []),
+            *requirement_args,
+        ]
+        return pip_install(args, "Installing main and SEO Lab dependencies")
+    finally:
+        if merged_file:
+            os.unlink(merged_file)
 
 def create_env_file():
     """Create .env file from template"""
@@ -53,14 +177,14 @@ def create_env_file():
     env_file = Path(".env")
     env_example = Path("env.example")
     
-    if env_file.exists():
+    if _exists(str(env_file)):
         print("✅ .env file already exists")
         return True
     
-    if env_example.exists():
-        # Copy env.example to .env
-        with open(env_example, 'r') as src, open(env_file, 'w') as dst:
-            dst.write(src.read())
+    if _exists(str(env_example)):
+        # Copy env.example to .env (byte-for-byte, kernel-side copy where available)
+        shutil.copyfile(env_example, env_file)
+        _list_dir.cache_clear()
         print("✅ Created .env file from template")
         print("⚠️  Please edit .env file with your actual API keys")
         return True
@@ -72,20 +196,12 @@ def verify_setup():
     """Verify the setup is working"""
     print("🔍 Verifying setup...")
     
-    # Check if main.py exists
-    if not Path("main.py").exists():
-        print("❌ main.py not found")
-        return False
-    
-    # Check if requirements.txt exists
-    if not Path("requirements.txt").exists():
-        print("❌ requirements.txt not found")
-        return False
-    
-    # Check if .env exists
-    if not Path(".env").exists():
-        print("❌ .env file not found")
-        return False
+    # Check main.py, requirements.txt and .env with a single (cached) directory read
+    names = _list_dir(".")
+    for filename in ("main.py", "requirements.txt", ".env"):
+        if filename not in names:
+            print(f"❌ {filename} not found")
+            return False
     
     print("✅ Setup verification passed")
     return True
@@ -4,154 +4,163 @@ Test script for the CPG Labs APIs
 Run this to test the API locally or after deployment
 """
 
-import requests
+import asyncio
+import io
+import httpx
 import json
-import time
 import os
-from dotenv import load_dotenv
+from functools import partial
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env only when they aren't already set (e.g. in CI)
+if not (os.getenv("API_BASE_URL") and os.getenv("EDGE_API_KEY")):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 API_KEY = os.getenv("EDGE_API_KEY", "your-secret-key-here")
 
-def test_health():
-    """Test the health endpoint"""
-    print("🔍 Testing health endpoint...")
+# Request headers and JSON bodies, built and encoded once at import
+JSON_HEADERS = {"Content-Type": "application/json", "x-api-key": API_KEY}
+INVALID_KEY_HEADERS = {"Content-Type": "application/json", "x-api-key": "invalid-key"}
+
+BLOG_PAYLOAD = {
+    "brand": "Nami Works",
+    "topic": "The Future of AI in Content Creation",
+    "keywords": ["AI content", "future tech", "content marketing"],
+    "language": "en-US",
+    "wordCount": 1000,
+    "additionalContext": "Focus on benefits for small businesses."
+}
+BLOG_PAYLOAD_BYTES = json.dumps(BLOG_PAYLOAD).encode()
+INVALID_KEY_PAYLOAD_BYTES = json.dumps({"brand": "Test Brand", "topic": "Test Topic"}).encode()
+# Missing required 'topic' field
+MISSING_FIELDS_PAYLOAD_BYTES = json.dumps({"brand": "Test Brand"}).encode()
+
+# Keys of the default JSON response consumed by the frontend
+GENERATE_RESPONSE_KEYS = {"html", "meta", "stats", "traceId"}
+
+def buffered_output():
+    """Per-test output buffer so tests running concurrently don't interleave prints"""
+    out = io.StringIO()
+    return out, partial(print, file=out)
+
+def make_client():
+    """Async HTTP/2 client shared by all tests - one event loop, one connection pool.
+    Over HTTPS the tests multiplex on one connection (one TLS handshake);
+    plain-HTTP servers are spoken to over HTTP/1.1 keep-alive."""
+    return httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=10.0,
+        transport=httpx.AsyncHTTPTransport(http2=True, retries=2),
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+    )
+
+async def _call(method, path, *, client, expect, headers=None, data=None, timeout=10):
+    """Send one request; returns (ok, response), or (False, exception) if it could not be sent"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
-        if response.status_code == 200:
-            print("✅ Health check passed")
-            print(f"Response: {response.json()}")
-        else:
-            print(f"❌ Health check failed: {response.status_code}")
-            print(f"Error: {response.text}")
-    except Exception as e:
-        print(f"❌ Health check error: {e}")
+        r = await client.request(method, path, headers=headers, content=data, timeout=timeout)
+    except httpx.HTTPError as e:
+        return False, e
+    return r.status_code == expect, r
+
+# The three POST tests share method and path - only expectations, headers and body vary
+_post_seo = partial(_call, "POST", "/api/seo/generate")
+
+def _failure(r):
+    """Status code of a failed call, or the exception that prevented it"""
+    return r if isinstance(r, Exception) else r.status_code
 
-def test_root():
+async def test_health(client, log):
+    """Test the health endpoint"""
+    log("🔍 Testing health endpoint...")
+    ok, r = await _call("GET", "/health", client=client, expect=200)
+    if ok:
+        body = r.json()
+        log("✅ Health check passed")
+        log(f"Response: {body}")
+    else:
+        log(f"❌ Health check failed: {_failure(r)}")
+
+async def test_root(client, log):
     """Test the root endpoint"""
-    print("\n🔍 Testing root endpoint...")
-    try:
-        response = requests.get(f"{API_BASE_URL}/", timeout=10)
-        if response.status_code == 200:
-            print("✅ Root endpoint passed")
-            print(f"Response: {response.json()}")
-        else:
-            print(f"❌ Root endpoint failed: {response.status_code}")
-    except Exception as e:
-        print(f"❌ Root endpoint error: {e}")
+    log("\n🔍 Testing root endpoint...")
+    ok, r = await _call("GET", "/", client=client, expect=200)
+    if ok:
+        body = r.json()
+        log("✅ Root endpoint passed")
+        log(f"Response: {body}")
+    else:
+        log(f"❌ Root endpoint failed: {_failure(r)}")
 
-def test_generate_blog():
+async def test_generate_blog(client, log):
     """Test the blog generation endpoint"""
-    print("\n🔍 Testing blog generation...")
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": API_KEY
-    }
+    log("\n🔍 Testing blog generation...")
+    log(f"Making request to: {API_BASE_URL}/api/seo/generate")
+    log(f"Payload: {json.dumps(BLOG_PAYLOAD, indent=2)}")
     
-    payload = {
-        "brand": "Nami Works",
-        "topic": "The Future of AI in Content Creation",
-        "keywords": ["AI content", "future tech", "content marketing"],
-        "language": "en-US",
-        "wordCount": 1000,
-        "additionalContext": "Focus on benefits for small businesses."
-    }
+    # 2 minutes timeout for generation
+    ok, r = await _post_seo(client=client, expect=200, headers=JSON_HEADERS, data=BLOG_PAYLOAD_BYTES, timeout=120)
+    if not ok:
+        log(f"❌ Blog generation failed: {_failure(r)}")
+        if not isinstance(r, Exception):
+            log(f"Error response: {r.text}")
+        return
     
-    try:
-        print(f"Making request to: {API_BASE_URL}/api/seo/generate")
-        print(f"Payload: {json.dumps(payload, indent=2)}")
-        
-        response = requests.post(
-            f"{API_BASE_URL}/api/seo/generate", 
-            headers=headers, 
-            data=json.dumps(payload), 
-            timeout=120  # 2 minutes timeout for generation
-        )
-        
-        if response.status_code == 200:
-            print("✅ Blog generation request successful")
-            result = response.json()
-            print(f"Generated HTML length: {len(result.get('html', ''))}")
-            print(f"Meta data: {result.get('meta', {})}")
-            print(f"Stats: {result.get('stats', {})}")
-            print(f"Trace ID: {result.get('traceId', 'N/A')}")
-            
-            # Save generated content to file
-            with open("generated_content.html", "w", encoding="utf-8") as f:
-                f.write(result.get('html', ''))
-            print("📄 Generated content saved to 'generated_content.html'")
-            
-        else:
-            print(f"❌ Blog generation failed: {response.status_code}")
-            print(f"Error response: {response.text}")
-            
-    except requests.exceptions.Timeout:
-        print("❌ Blog generation request timed out (120s)")
-    except Exception as e:
-        print(f"❌ Blog generation error: {e}")
+    result = r.json()
+    missing = GENERATE_RESPONSE_KEYS - result.keys()
+    if missing:
+        log(f"❌ Blog generation response missing keys: {sorted(missing)}")
+        return
+    log("✅ Blog generation request successful")
+    log(f"Generated HTML length: {len(result['html'])}")
+    log(f"Meta data: {result['meta']}")
+    log(f"Stats: {result['stats']}")
+    log(f"Trace ID: {result['traceId']}")
+    
+    # Save the HTML that was just checked - one generation per run
+    with open("generated_content.html", "w", encoding="utf-8") as f:
+        f.write(result['html'])
+    log("📄 Generated content saved to 'generated_content.html'")
 
-def test_invalid_api_key():
+async def test_invalid_api_key(client, log):
     """Test with invalid API key"""
-    print("\n🔍 Testing invalid API key...")
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": "invalid-key"
-    }
-    
-    payload = {
-        "brand": "Test Brand",
-        "topic": "Test Topic"
-    }
-    
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/seo/generate", 
-            headers=headers, 
-            data=json.dumps(payload), 
-            timeout=10
-        )
-        
-        if response.status_code == 401:
-            print("✅ Invalid API key correctly rejected")
-        else:
-            print(f"❌ Expected 401, got {response.status_code}")
-            
-    except Exception as e:
-        print(f"❌ Invalid API key test error: {e}")
+    log("\n🔍 Testing invalid API key...")
+    ok, r = await _post_seo(client=client, expect=401, headers=INVALID_KEY_HEADERS, data=INVALID_KEY_PAYLOAD_BYTES)
+    log("✅ Invalid API key correctly rejected" if ok else f"❌ Expected 401, got {_failure(r)}")
 
-def test_missing_fields():
+async def test_missing_fields(client, log):
     """Test with missing required fields"""
-    print("\n🔍 Testing missing required fields...")
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": API_KEY
-    }
-    
-    # Missing required 'topic' field
-    payload = {
-        "brand": "Test Brand"
-    }
-    
+    log("\n🔍 Testing missing required fields...")
+    ok, r = await _post_seo(client=client, expect=422, headers=JSON_HEADERS, data=MISSING_FIELDS_PAYLOAD_BYTES)
+    if ok:
+        log("✅ Missing fields correctly rejected")
+    else:
+        log(f"❌ Expected 422, got {_failure(r)}")
+        if not isinstance(r, Exception):
+            log(f"Response: {r.text}")
+
+async def _run_test(label, test, client):
+    """Run one test into its own output buffer - unexpected errors are reported, not raised,
+    so one failing test can't abort the others"""
+    out, log = buffered_output()
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/seo/generate", 
-            headers=headers, 
-            data=json.dumps(payload), 
-            timeout=10
-        )
-        
-        if response.status_code == 422:
-            print("✅ Missing fields correctly rejected")
-        else:
-            print(f"❌ Expected 422, got {response.status_code}")
-            print(f"Response: {response.text}")
-            
+        await test(client, log)
     except Exception as e:
-        print(f"❌ Missing fields test error: {e}")
+        log(f"❌ {label} error: {e}")
+    return out.getvalue()
+
+async def run_tests():
+    """Run all tests concurrently on one event loop and return their output in order"""
+    tests = [
+        ("Health check", test_health),
+        ("Root endpoint", test_root),
+        ("Invalid API key test", test_invalid_api_key),
+        ("Missing fields test", test_missing_fields),
+        ("Blog generation", test_generate_blog),
+    ]
+    async with make_client() as client:
+        return await asyncio.gather(*(_run_test(label, test, client) for label, test in tests))
 
 def main():
     """Run all tests"""
@@ -160,12 +169,10 @@ def main():
     print(f"API Key: {'*' * len(API_KEY) if API_KEY != 'your-secret-key-here' else 'NOT SET'}")
     print("=" * 50)
     
-    # Run tests
-    test_health()
-    test_root()
-    test_invalid_api_key()
-    test_missing_fields()
-    test_generate_blog()
+    # Run tests concurrently - they are independent, so wall time is the slowest one.
+    # Each test's buffered output is printed in the original order.
+    for output in asyncio.run(run_tests()):
+        print(output, end="")
     
     print("\n" + "=" * 50)
     print("🏁 Test suite completed!")